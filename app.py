@@ -8,6 +8,18 @@ import numpy
 import bcrypt
 from dotenv import load_dotenv
 import platform
+import json
+import zlib
+import base64
+import difflib
+import threading
+import click
+from functools import lru_cache
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+import re
+from urllib.parse import unquote, urlsplit
+from werkzeug.utils import secure_filename
+from PIL import Image, ImageOps, ExifTags
 
 # config
 load_dotenv()
@@ -30,12 +42,17 @@ os.makedirs(POSTS_DIR, exist_ok=True)
 os.makedirs(PROJECTS_DIR, exist_ok=True)
 os.makedirs(NOTES_DIR, exist_ok=True)
 ALLOWED_EXTENSIONS = {"md"}
+ALLOWED_IMAGE_EXTENSIONS = {"png", "jpg", "jpeg", "gif", "webp"}
 
 
 def allowed_file(filename):
     return "." in filename and filename.rsplit(".", 1)[1].lower() in ALLOWED_EXTENSIONS and filename
 
 
+def allowed_image(filename):
+    return "." in filename and filename.rsplit(".", 1)[1].lower() in ALLOWED_IMAGE_EXTENSIONS and filename
+
+
 # ── Kategori Yardımcıları ──────────────────────────────────────
 
 def get_categories(base_dir):
@@ -71,6 +88,16 @@ def ensure_category_dir(base_dir, category, keywords_text=""):
             f.write(keywords_text.strip() + "\n")
 
 
+def get_document_path(base_dir, category, slug):
+    """URL'den gelen kategori ve slug için .md yolunu döndürür; geçersizse None.
+
+    ".." gibi klasör dışına çıkan değerler secure_filename ile değişir ve reddedilir.
+    """
+    if secure_filename(category) != category or secure_filename(slug) != slug:
+        return None
+    return os.path.join(base_dir, category, slug + ".md")
+
+
 def find_item_category(base_dir, slug):
     """Slug'a göre dosyanın hangi kategoride olduğunu bulur."""
     for category in get_categories(base_dir):
@@ -80,6 +107,610 @@ def find_item_category(base_dir, slug):
     return None
 
 
+# ── Render Yardımcıları ──────────────────────────────────────
+
+@lru_cache(maxsize=256)
+def _render_markdown_cached(file_path, mtime_ns, size):
+    with open(file_path, "r", encoding="utf-8") as f:
+        md_content = f.read()
+    return markdown2.markdown(md_content, extras=["fenced-code-blocks", "tables"])
+
+
+@lru_cache(maxsize=256)
+def _render_with_images_cached(file_path, mtime_ns, size, image_stats):
+    html_content = _render_markdown_cached(file_path, mtime_ns, size)
+    return rewrite_image_refs(html_content, file_path)
+
+
+def render_markdown_file(file_path):
+    """Markdown dosyasını HTML'e çevirir; dosya değişmediyse önbellekten döner.
+
+    Referans verilen eklerin stat bilgisi de anahtara dahildir; bir görsel
+    eklendiğinde veya değiştiğinde referanslar (ve sürüm etiketleri) yeniden yazılır.
+    """
+    stat = os.stat(file_path)
+    html_content = _render_markdown_cached(file_path, stat.st_mtime_ns, stat.st_size)
+    image_stats = get_image_stats(html_content, os.path.dirname(file_path))
+    if not image_stats:
+        return html_content
+    return _render_with_images_cached(file_path, stat.st_mtime_ns, stat.st_size, image_stats)
+
+
+def get_created_time(file_path):
+    """Dosyanın oluşturulma (Windows) veya değiştirilme tarihini döndürür."""
+    stat = os.stat(file_path)
+    ts = stat.st_ctime if platform.system() == "Windows" else stat.st_mtime
+    return datetime.fromtimestamp(ts).strftime("%Y %m %d")
+
+
+# ── Görsel Ekleri ──────────────────────────────────────
+# Dokümanla birlikte yüklenen görseller kategori klasöründe tutulur. Render
+# sırasında göreli <img> referansları /media URL'lerine çevrilir ve srcset ile
+# yeniden boyutlandırılmış / WebP varyantlar sunulur. Varyantlar ilk istekte
+# arka plan havuzunda üretilir ve MEDIA_CACHE_DIR altında saklanır.
+
+MEDIA_CACHE_DIR = os.path.join(BASE_DIR, ".cache", "media")
+VARIANT_WIDTHS = (480, 960, 1600)
+VARIANT_WAIT_SECONDS = 5
+IMAGE_SIZES = "(max-width: 900px) 100vw, 900px"
+# Animasyonlu olabilen gif'ler yeniden kodlanmaz, olduğu gibi sunulur
+RESIZABLE_EXTENSIONS = {"png", "jpg", "jpeg", "webp"}
+PIL_FORMATS = {"png": "PNG", "jpg": "JPEG", "jpeg": "JPEG", "webp": "WEBP"}
+ALLOWED_IMAGE_FORMATS = {"PNG", "JPEG", "GIF", "WEBP"}
+
+_variant_pool = ThreadPoolExecutor(max_workers=os.cpu_count() or 2)
+_variant_jobs = {}
+_variant_failures = set()
+_variant_lock = threading.Lock()
+
+IMG_TAG_RE = re.compile(r"<img\s[^>]*>")
+IMG_SRC_RE = re.compile(r'\ssrc="([^"]*)"')
+
+
+def check_attachments(files):
+    """Ekleri doğrular; sorun varsa hata mesajı, yoksa None döndürür.
+
+    Dosya adı secure_filename ile değişmemeli (markdown referansı birebir
+    eşleşsin diye) ve içerik gerçekten bir görsel olmalıdır.
+    """
+    for file in files:
+        if secure_filename(file.filename) != file.filename or not allowed_image(file.filename):
+            return f"Geçersiz dosya adı: {file.filename}"
+        try:
+            with Image.open(file.stream) as img:
+                img.verify()
+                image_format = img.format
+        except Exception:
+            # Pillow bozuk dosyalarda farklı türde hatalar fırlatabiliyor
+            image_format = None
+        finally:
+            file.stream.seek(0)
+        if image_format not in ALLOWED_IMAGE_FORMATS:
+            return f"Geçerli bir görsel değil: {file.filename}"
+    return None
+
+
+def taken_attachment_names(cat_dir, files):
+    """Kategori klasöründe zaten bulunan (başka dokümana ait olabilecek) ek adlarını döndürür."""
+    names = [file.filename for file in files]
+    return sorted({
+        name for name in names
+        if names.count(name) > 1 or os.path.exists(os.path.join(cat_dir, name))
+    })
+
+
+def save_attachments(cat_dir, files):
+    """Görsel eklerini doküman ile aynı kategori klasörüne kaydeder."""
+    names = []
+    for file in files:
+        name = secure_filename(file.filename)
+        file.save(os.path.join(cat_dir, name))
+        names.append(name)
+    return names
+
+
+def _local_image_name(src):
+    """Göreli bir ek referansıysa dosya adını, değilse None döndürür."""
+    url = urlsplit(src)
+    if url.scheme or url.netloc or url.path.startswith("/"):
+        return None
+    name = unquote(url.path)
+    if secure_filename(name) != name or not allowed_image(name):
+        return None
+    return name
+
+
+def get_image_stats(html_content, cat_dir):
+    """HTML'de referans verilen eklerin (ad, mtime, boyut) bilgisini döndürür."""
+    stats = []
+    for tag in IMG_TAG_RE.findall(html_content):
+        src = IMG_SRC_RE.search(tag)
+        name = src and _local_image_name(src.group(1))
+        if not name:
+            continue
+        try:
+            stat = os.stat(os.path.join(cat_dir, name))
+            stats.append((name, stat.st_mtime_ns, stat.st_size))
+        except OSError:
+            # Henüz yüklenmemiş ek: yüklendiğinde anahtar değişsin
+            stats.append((name, None, None))
+    return tuple(stats)
+
+
+def get_file_version(file_path):
+    """Dosya değiştiğinde değişen kısa bir sürüm etiketi döndürür (cache busting)."""
+    return format(os.stat(file_path).st_mtime_ns, "x")
+
+
+def get_image_size(image_path):
+    """Görselin EXIF yönü uygulanmış (ekranda görünen) boyutunu döndürür.
+
+    _generate_variant exif_transpose uyguladığı için 5-8 yönlerinde
+    genişlik ve yükseklik yer değiştirir.
+    """
+    with Image.open(image_path) as img:
+        width, height = img.size
+        orientation = img.getexif().get(ExifTags.Base.Orientation, 1)
+    if orientation in (5, 6, 7, 8):
+        width, height = height, width
+    return width, height
+
+
+def get_variant_widths(image_width):
+    """Bir görsel için üretilecek varyant genişliklerini döndürür (büyütme yapılmaz)."""
+    return [w for w in VARIANT_WIDTHS if w < image_width] + [image_width]
+
+
+def _media_url(kind, category, filename, version, width=None, fmt=None):
+    params = {"v": version}
+    if width:
+        params["w"] = width
+    if fmt:
+        params["fmt"] = fmt
+    return url_for("media_file", kind=kind, category=category, filename=filename, **params)
+
+
+def _build_picture(tag, kind, category, filename, image_path):
+    """Tek bir <img> etiketini srcset'li <picture> etiketine çevirir."""
+    version = get_file_version(image_path)
+    ext = filename.rsplit(".", 1)[1].lower()
+    if ext not in RESIZABLE_EXTENSIONS:
+        src = _media_url(kind, category, filename, version)
+        return IMG_SRC_RE.sub(f' src="{src}"', tag, count=1)
+
+    width, height = get_image_size(image_path)
+    widths = get_variant_widths(width)
+    default_width = max([w for w in widths if w <= VARIANT_WIDTHS[1]], default=widths[0])
+
+    def srcset(fmt=None):
+        return ", ".join(f"{_media_url(kind, category, filename, version, w, fmt)} {w}w" for w in widths)
+
+    attrs = (
+        f' src="{_media_url(kind, category, filename, version, default_width)}"'
+        f' srcset="{srcset()}" sizes="{IMAGE_SIZES}"'
+        f' width="{width}" height="{height}" loading="lazy" decoding="async"'
+    )
+    img_tag = IMG_SRC_RE.sub(lambda m: attrs, tag, count=1)
+    return (
+        f'<picture><source type="image/webp" srcset="{srcset("webp")}" sizes="{IMAGE_SIZES}">'
+        f"{img_tag}</picture>"
+    )
+
+
+def rewrite_image_refs(html_content, file_path):
+    """Kategori klasöründeki eklere işaret eden göreli görsel referanslarını yeniden yazar."""
+    cat_dir = os.path.dirname(file_path)
+    category = os.path.basename(cat_dir)
+    kind = os.path.basename(os.path.dirname(cat_dir))
+
+    def replace(match):
+        tag = match.group(0)
+        src = IMG_SRC_RE.search(tag)
+        if not src:
+            return tag
+        filename = _local_image_name(src.group(1))
+        if not filename:
+            return tag
+        image_path = os.path.join(cat_dir, filename)
+        if not os.path.isfile(image_path):
+            return tag
+        try:
+            return _build_picture(tag, kind, category, filename, image_path)
+        except Exception:
+            # Bozuk görsel: orijinal referansı bırak
+            return tag
+
+    return IMG_TAG_RE.sub(replace, html_content)
+
+
+def _generate_variant(source_path, target_path, width, fmt):
+    """Görseli verilen genişliğe küçültüp istenen formatta kaydeder."""
+    with Image.open(source_path) as img:
+        img = ImageOps.exif_transpose(img)
+        if width and width < img.width:
+            height = round(img.height * width / img.width)
+            img = img.resize((width, height), Image.LANCZOS)
+        if fmt == "JPEG" and img.mode not in ("RGB", "L"):
+            img = img.convert("RGB")
+        os.makedirs(os.path.dirname(target_path), exist_ok=True)
+        tmp_path = target_path + ".tmp"
+        try:
+            img.save(tmp_path, format=fmt, quality=82, optimize=True)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+    os.replace(tmp_path, target_path)
+    remove_stale_variants(target_path)
+    return target_path
+
+
+def _parse_variant_name(name):
+    """'<kaynak dosya>-<sürüm>-<genişlik>.<uzantı>' adını (kaynak, sürüm) olarak ayırır."""
+    if name.endswith(".tmp"):
+        # Üretimi süren varyant
+        return None, None
+    parts = os.path.splitext(name)[0].rsplit("-", 2)
+    if len(parts) != 3:
+        return None, None
+    return parts[0], parts[1]
+
+
+def remove_stale_variants(target_path):
+    """Aynı kaynağın eski sürümlerine ait varyantları siler."""
+    variant_dir, name = os.path.split(target_path)
+    source, version = _parse_variant_name(name)
+    for other in os.listdir(variant_dir):
+        other_source, other_version = _parse_variant_name(other)
+        if other_source == source and other_version != version:
+            try:
+                os.remove(os.path.join(variant_dir, other))
+            except FileNotFoundError:
+                pass
+
+
+def prune_variant_dir(variant_dir, source_dir):
+    """Kaynağı silinmiş veya değişmiş varyantları siler; silinen dosya sayısını döndürür."""
+    removed = 0
+    for name in os.listdir(variant_dir):
+        if name.endswith(".tmp"):
+            continue
+        source, version = _parse_variant_name(name)
+        source_path = os.path.join(source_dir, source) if source else None
+        if source_path and os.path.isfile(source_path) and get_file_version(source_path) == version:
+            continue
+        os.remove(os.path.join(variant_dir, name))
+        removed += 1
+    return removed
+
+
+def get_image_variant(source_path, target_path, width, fmt):
+    """Varyantı önbellekten döndürür; yoksa havuzda üretir ve sınırlı süre bekler.
+
+    Süre dolarsa veya üretim başarısız olursa None döner; çağıran orijinali
+    sunar. Başarısız varyantlar (aynı sürüm için) tekrar denenmez.
+    """
+    if os.path.exists(target_path):
+        return target_path
+    with _variant_lock:
+        if target_path in _variant_failures:
+            return None
+        future = _variant_jobs.get(target_path)
+        if future is None:
+            future = _variant_pool.submit(_generate_variant, source_path, target_path, width, fmt)
+            _variant_jobs[target_path] = future
+            future.add_done_callback(lambda f: _variant_jobs.pop(target_path, None))
+    try:
+        return future.result(timeout=VARIANT_WAIT_SECONDS)
+    except FutureTimeoutError:
+        return None
+    except Exception:
+        # WebP desteği olmayan Pillow, bozuk dosya, decompression bomb vb.
+        app.logger.exception("Görsel varyantı üretilemedi: %s", target_path)
+        with _variant_lock:
+            _variant_failures.add(target_path)
+        return None
+
+
+# ── Revizyon Geçmişi ──────────────────────────────────────
+# Her kayıt, dokümanın kategori klasöründeki .history/<slug>.log dosyasına
+# bir satır (JSON) olarak eklenir. Revizyonlar bir öncekine göre sıkıştırılmış
+# satır farkı (delta) olarak tutulur; her SNAPSHOT_INTERVAL revizyonda bir tam
+# kopya yazılarak bir sürümü yeniden kurma maliyeti sınırlanır.
+
+HISTORY_DIRNAME = ".history"
+SNAPSHOT_INTERVAL = 20
+_history_lock = threading.RLock()
+
+
+def get_history_path(doc_path):
+    """Dokümanın revizyon log dosyasının yolunu döndürür."""
+    directory, filename = os.path.split(doc_path)
+    slug = os.path.splitext(filename)[0]
+    return os.path.join(directory, HISTORY_DIRNAME, slug + ".log")
+
+
+def _encode_payload(obj):
+    raw = json.dumps(obj, ensure_ascii=False).encode("utf-8")
+    return base64.b64encode(zlib.compress(raw, 9)).decode("ascii")
+
+
+def _decode_payload(data):
+    return json.loads(zlib.decompress(base64.b64decode(data)).decode("utf-8"))
+
+
+def make_delta(old_text, new_text):
+    """İki metin arasındaki satır farkını op listesi olarak döndürür.
+
+    ["=", i1, i2] eski metinden satır kopyalar, ["+", [...]] yeni satır ekler.
+    """
+    old_lines = old_text.splitlines(keepends=True)
+    new_lines = new_text.splitlines(keepends=True)
+    ops = []
+    matcher = difflib.SequenceMatcher(None, old_lines, new_lines)
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag == "equal":
+            ops.append(["=", i1, i2])
+        elif j2 > j1:
+            ops.append(["+", new_lines[j1:j2]])
+    return ops
+
+
+def apply_delta(old_text, ops):
+    """make_delta çıktısını eski metne uygulayarak yeni metni üretir."""
+    old_lines = old_text.splitlines(keepends=True)
+    parts = []
+    for op in ops:
+        if op[0] == "=":
+            parts.extend(old_lines[op[1]:op[2]])
+        else:
+            parts.extend(op[1])
+    return "".join(parts)
+
+
+def read_history(log_path):
+    """Log dosyasındaki revizyon kayıtlarını sırayla döndürür."""
+    if not os.path.exists(log_path):
+        return []
+    records = []
+    with open(log_path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                records.append(json.loads(line))
+            except ValueError:
+                # Yarım kalmış (çökme sırasında yazılan) satırı atla
+                continue
+    return records
+
+
+def reconstruct_revision(records, rev):
+    """Verilen revizyonun içeriğini en yakın tam kopyadan başlayarak kurar.
+
+    Revizyon yoksa veya bir silme kaydıysa None döner.
+    """
+    index = next((i for i, r in enumerate(records) if r["rev"] == rev), None)
+    if index is None or records[index]["kind"] == "delete":
+        return None
+    start = index
+    while records[start]["kind"] != "snapshot":
+        start -= 1
+    content = _decode_payload(records[start]["data"])
+    for record in records[start + 1:index + 1]:
+        content = apply_delta(content, _decode_payload(record["data"]))
+    return content
+
+
+def _build_record(rev, content, previous, since_snapshot, timestamp=None):
+    """Bir revizyon kaydı oluşturur; uygun değilse delta yerine tam kopya yazar."""
+    record = {
+        "rev": rev,
+        "time": timestamp or datetime.now().isoformat(timespec="seconds"),
+        "kind": "snapshot",
+        "data": _encode_payload(content),
+    }
+    if previous is not None and since_snapshot < SNAPSHOT_INTERVAL - 1:
+        delta = _encode_payload(make_delta(previous, content))
+        if len(delta) < len(record["data"]):
+            record["kind"] = "delta"
+            record["data"] = delta
+    return record
+
+
+def _append_record(log_path, record):
+    os.makedirs(os.path.dirname(log_path), exist_ok=True)
+    with open(log_path, "a", encoding="utf-8") as f:
+        f.write(json.dumps(record) + "\n")
+
+
+def _last_state(records):
+    """Son revizyonun içeriğini ve son tam kopyadan beri geçen kayıt sayısını döndürür."""
+    if not records or records[-1]["kind"] == "delete":
+        return None, 0
+    since_snapshot = 0
+    for record in reversed(records):
+        if record["kind"] == "snapshot":
+            break
+        since_snapshot += 1
+    return reconstruct_revision(records, records[-1]["rev"]), since_snapshot
+
+
+def record_revision(doc_path):
+    """Dokümanın diskteki halini revizyon loguna ekler (değişmediyse eklemez)."""
+    with open(doc_path, "r", encoding="utf-8", errors="replace") as f:
+        content = f.read()
+    log_path = get_history_path(doc_path)
+    with _history_lock:
+        records = read_history(log_path)
+        previous, since_snapshot = _last_state(records)
+        if previous == content:
+            return records[-1]["rev"]
+        rev = records[-1]["rev"] + 1 if records else 1
+        _append_record(log_path, _build_record(rev, content, previous, since_snapshot))
+    return rev
+
+
+def record_current(doc_path):
+    """Üzerine yazmadan önce dosyanın mevcut halini loga işler.
+
+    Log'u olmayan (bu özellikten önce eklenmiş) veya dışarıdan değiştirilmiş
+    dokümanların orijinal içeriği böylece kaybolmaz.
+    """
+    if os.path.exists(doc_path):
+        record_revision(doc_path)
+
+
+def record_deletion(doc_path):
+    """Dokümanın silindiğini revizyon loguna işler; önceki sürümler korunur.
+
+    Dosya silinmeden önce çağrılmalıdır: son kayıt mevcut içeriği tutmuyorsa
+    önce bir tam kopya alınır.
+    """
+    log_path = get_history_path(doc_path)
+    with _history_lock:
+        record_current(doc_path)
+        records = read_history(log_path)
+        rev = records[-1]["rev"] + 1 if records else 1
+        _append_record(log_path, {
+            "rev": rev,
+            "time": datetime.now().isoformat(timespec="seconds"),
+            "kind": "delete",
+        })
+    return rev
+
+
+def compact_history(log_path, keep=None):
+    """Log dosyasını yeniden yazar; keep verilirse sadece son `keep` revizyonu tutar.
+
+    Revizyon numaraları korunur, ilk tutulan revizyon tam kopya olarak yazılır.
+    (eski boyut, yeni boyut) döndürür.
+    """
+    with _history_lock:
+        records = read_history(log_path)
+        old_size = os.path.getsize(log_path) if os.path.exists(log_path) else 0
+        if not records:
+            return old_size, old_size
+
+        # Tüm sürümleri tek geçişte kur
+        contents = []
+        current = None
+        for record in records:
+            if record["kind"] == "snapshot":
+                current = _decode_payload(record["data"])
+            elif record["kind"] == "delta":
+                current = apply_delta(current, _decode_payload(record["data"]))
+            else:
+                current = None
+            contents.append(current)
+
+        if keep:
+            records = records[-keep:]
+            contents = contents[-keep:]
+
+        tmp_path = log_path + ".tmp"
+        previous, since_snapshot = None, 0
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            for record, content in zip(records, contents):
+                if record["kind"] == "delete":
+                    new_record = record
+                    previous = None
+                else:
+                    new_record = _build_record(record["rev"], content, previous, since_snapshot, record["time"])
+                    previous = content
+                since_snapshot = since_snapshot + 1 if new_record["kind"] == "delta" else 0
+                f.write(json.dumps(new_record) + "\n")
+        os.replace(tmp_path, log_path)
+    return old_size, os.path.getsize(log_path)
+
+
+def is_deleted(doc_path):
+    """Doküman silinmiş ve geçmişi duruyorsa True döner."""
+    records = read_history(get_history_path(doc_path))
+    return not os.path.exists(doc_path) and bool(records) and records[-1]["kind"] == "delete"
+
+
+def _public_history(base_dir, category, slug):
+    """Yayındaki dokümanın revizyon kayıtlarını döndürür; silinmişse 404.
+
+    Aynı slug ile yeniden eklenen bir doküman eski log'a yazmaya devam eder;
+    silinmiş dokümanın revizyonları yayına dönmesin diye sadece son silme
+    kaydından sonraki kayıtlar döndürülür (silmeden sonraki ilk kayıt her
+    zaman tam kopyadır).
+    """
+    records = read_history(get_history_path(os.path.join(base_dir, category, slug + ".md")))
+    if not records or records[-1]["kind"] == "delete":
+        abort(404)
+    last_delete = max((i for i, r in enumerate(records) if r["kind"] == "delete"), default=-1)
+    return records[last_delete + 1:]
+
+
+def history_response(base_dir, category, slug):
+    """Dokümanın revizyon listesini JSON olarak döndürür."""
+    records = _public_history(base_dir, category, slug)
+    return jsonify([
+        {
+            "rev": r["rev"],
+            "time": r["time"],
+            "kind": r["kind"],
+            "stored_bytes": len(base64.b64decode(r["data"])) if "data" in r else 0,
+        }
+        for r in records
+    ])
+
+
+def revision_response(base_dir, category, slug, rev):
+    """Verilen revizyonun markdown içeriğini döndürür."""
+    records = _public_history(base_dir, category, slug)
+    content = reconstruct_revision(records, rev)
+    if content is None:
+        abort(404)
+    return content, 200, {"Content-Type": "text/markdown; charset=utf-8"}
+
+
+def get_requested_revision():
+    """Formdaki revizyon numarasını döndürür; boşsa None, sayı değilse 400."""
+    revision = request.form.get("revision", "").strip()
+    if not revision:
+        return None
+    if not revision.isdigit():
+        abort(400)
+    return int(revision)
+
+
+def restore_revision(doc_path, rev=None):
+    """Dokümanı verilen revizyona geri döndürür; geri dönüş de yeni bir revizyondur.
+
+    rev verilmezse silinmeden/değişmeden önceki son içerikli revizyon kullanılır.
+    """
+    records = read_history(get_history_path(doc_path))
+    if rev is None:
+        rev = next((r["rev"] for r in reversed(records) if r["kind"] != "delete"), None)
+    content = reconstruct_revision(records, rev)
+    if content is None:
+        return False
+    record_current(doc_path)
+    with open(doc_path, "w", encoding="utf-8") as f:
+        f.write(content)
+    record_revision(doc_path)
+    return True
+
+
+@app.cli.command("compact-history")
+@click.option("--keep", type=click.IntRange(min=1), default=None, help="Doküman başına tutulacak son revizyon sayısı.")
+def compact_history_command(keep):
+    """Tüm revizyon loglarını sıkıştırır."""
+    for base_dir in (POSTS_DIR, PROJECTS_DIR, NOTES_DIR):
+        for category in get_categories(base_dir):
+            history_dir = os.path.join(base_dir, category, HISTORY_DIRNAME)
+            if not os.path.isdir(history_dir):
+                continue
+            for name in sorted(os.listdir(history_dir)):
+                if not name.endswith(".log"):
+                    continue
+                log_path = os.path.join(history_dir, name)
+                old_size, new_size = compact_history(log_path, keep)
+                click.echo(f"{os.path.relpath(log_path, BASE_DIR)}: {old_size} -> {new_size} bytes")
+
+
 # ── Post Fonksiyonları ──────────────────────────────────────
 
 def get_post_names():
@@ -115,10 +746,7 @@ def get_post_content(index=None):
     post = posts[index]
     file_path = os.path.join(POSTS_DIR, post["category"], post["slug"] + ".md")
 
-    with open(file_path, "r", encoding="utf-8") as f:
-        md_content = f.read()
-
-    html_content = markdown2.markdown(md_content, extras=["fenced-code-blocks","tables"])
+    html_content = render_markdown_file(file_path)
     return {
         "name": post["slug"],
         "category": post["category"],
@@ -162,10 +790,7 @@ def get_project_content(index=None):
     project = projects[index]
     file_path = os.path.join(PROJECTS_DIR, project["category"], project["slug"] + ".md")
 
-    with open(file_path, "r", encoding="utf-8") as f:
-        md_content = f.read()
-
-    html_content = markdown2.markdown(md_content, extras=["fenced-code-blocks","tables"])
+    html_content = render_markdown_file(file_path)
     return {
         "name": project["slug"],
         "category": project["category"],
@@ -208,10 +833,7 @@ def get_note_content(index=None):
     note = notes[index]
     file_path = os.path.join(NOTES_DIR, note["category"], note["slug"] + ".md")
 
-    with open(file_path, "r", encoding="utf-8") as f:
-        md_content = f.read()
-
-    html_content = markdown2.markdown(md_content, extras=["fenced-code-blocks","tables"])
+    html_content = render_markdown_file(file_path)
     return {
         "name": note["slug"],
         "category": note["category"],
@@ -252,15 +874,10 @@ def show_post(category, post_id):
     if not os.path.exists(post_file):
         return "Yazı bulunamadı", 404
 
-    with open(post_file, "r", encoding="utf-8") as f:
-        md_content = f.read()
-
-    stat = os.stat(post_file)
-    ts = stat.st_ctime if platform.system() == "Windows" else stat.st_mtime
-    created_time = datetime.fromtimestamp(ts).strftime("%Y %m %d")
+    created_time = get_created_time(post_file)
 
     keywords = get_category_keywords(POSTS_DIR, category)
-    html_content = markdown2.markdown(md_content, extras=["fenced-code-blocks", "tables"])
+    html_content = render_markdown_file(post_file)
 
     return render_template('post.html',
         content=html_content,
@@ -299,6 +916,11 @@ def add_post():
         if not allowed_file(file.filename):
             return "Sadece .md dosyası kabul edilir", 400
 
+        attachments = [f for f in request.files.getlist("attachments") if f.filename]
+        error = check_attachments(attachments)
+        if error:
+            return error, 400
+
         # Kategori belirleme
         if category_select == "__new__" and new_category:
             category = slugify(new_category)
@@ -318,8 +940,15 @@ def add_post():
             slug = f"{base_slug}-{i}"
             i += 1
 
+        # Ekler, kategorideki başka bir dokümanın görselinin üzerine yazmasın
+        taken = taken_attachment_names(cat_dir, attachments)
+        if taken:
+            return "Dosya adı kullanımda: " + ", ".join(taken), 409
+
         save_path = os.path.join(cat_dir, slug + ".md")
         file.save(save_path)
+        record_revision(save_path)
+        save_attachments(cat_dir, attachments)
         return redirect(url_for("posts_page"))
 
     categories = get_categories(POSTS_DIR)
@@ -336,13 +965,26 @@ def download_post(category, post_id):
     )
 
 
+@app.route("/posts/history/<category>/<post_id>")
+def post_history(category, post_id):
+    return history_response(POSTS_DIR, category, post_id)
+
+
+@app.route("/posts/revision/<category>/<post_id>/<int:rev>")
+def post_revision(category, post_id, rev):
+    return revision_response(POSTS_DIR, category, post_id, rev)
+
+
 @app.route("/posts/update/<category>/<post_id>", methods=["GET", "POST"])
 def update_post(category, post_id):
     post_path = os.path.join(POSTS_DIR, category, f"{post_id}.md")
 
     if request.method == "GET":
         if not os.path.exists(post_path):
-            abort(404)
+            # Silinmiş doküman: sadece geri yükleme formu gösterilir
+            if not is_deleted(post_path):
+                abort(404)
+            return render_template("update_post.html", post_id=post_id, category=category, content="", deleted=True)
         with open(post_path, "r", encoding="utf-8") as f:
             content = f.read()
         return render_template("update_post.html", post_id=post_id, category=category, content=content)
@@ -363,8 +1005,10 @@ def update_post(category, post_id):
         if content is None:
             abort(400)
         # Dosya içeriğini güncelle (overwrite)
+        record_current(post_path)
         with open(post_path, "w", encoding="utf-8") as f:
             f.write(content)
+        record_revision(post_path)
         # Kaydettikten sonra postu görüntülemeye git (veya tekrar edit sayfasına)
         return redirect(url_for("show_post", category=category, post_id=post_id))
 
@@ -373,9 +1017,36 @@ def update_post(category, post_id):
         file = request.files.get("file")
         if not file or not file.filename.endswith(".md"):
             abort(400)
+        record_current(post_path)
         file.save(post_path)
+        record_revision(post_path)
         return redirect(url_for("posts_page"))
 
+    # Attach
+    if action == "attach":
+        if not os.path.exists(post_path):
+            abort(404)
+        attachments = [f for f in request.files.getlist("attachments") if f.filename]
+        if not attachments:
+            abort(400)
+        error = check_attachments(attachments)
+        if error:
+            return error, 400
+        cat_dir = os.path.join(POSTS_DIR, category)
+        taken = taken_attachment_names(cat_dir, attachments)
+        if taken:
+            return "Dosya adı kullanımda: " + ", ".join(taken), 409
+        save_attachments(cat_dir, attachments)
+        return redirect(url_for("update_post", category=category, post_id=post_id))
+
+    # Restore
+    if action == "restore":
+        # Boş bırakılırsa son içerikli revizyona döner (silinmiş dokümanlar için)
+        rev = get_requested_revision()
+        if not restore_revision(post_path, rev):
+            abort(404)
+        return redirect(url_for("show_post", category=category, post_id=post_id))
+
     # Delete
     if action == "delete":
         confirm_slug = request.form.get("confirm_slug")
@@ -383,6 +1054,7 @@ def update_post(category, post_id):
             return "Slug eşleşmiyor", 403
         if not os.path.exists(post_path):
             abort(404)
+        record_deletion(post_path)
         os.remove(post_path)
         return redirect(url_for("posts_page"))
 
@@ -404,15 +1076,10 @@ def show_project(category, project_id):
     if not os.path.exists(project_file):
         return "Yazı bulunamadı", 404
 
-    with open(project_file, "r", encoding="utf-8") as f:
-        md_content = f.read()
-
-    stat = os.stat(project_file)
-    ts = stat.st_ctime if platform.system() == "Windows" else stat.st_mtime
-    created_time = datetime.fromtimestamp(ts).strftime("%Y %m %d")
+    created_time = get_created_time(project_file)
 
     keywords = get_category_keywords(PROJECTS_DIR, category)
-    html_content = markdown2.markdown(md_content, extras=["fenced-code-blocks", "tables"])
+    html_content = render_markdown_file(project_file)
 
     return render_template('project.html',
         content=html_content,
@@ -449,6 +1116,11 @@ def add_project():
         if not allowed_file(file.filename):
             return "Sadece .md dosyası kabul edilir", 400
 
+        attachments = [f for f in request.files.getlist("attachments") if f.filename]
+        error = check_attachments(attachments)
+        if error:
+            return error, 400
+
         # Kategori belirleme
         if category_select == "__new__" and new_category:
             category = slugify(new_category)
@@ -468,8 +1140,15 @@ def add_project():
             slug = f"{base_slug}-{i}"
             i += 1
 
+        # Ekler, kategorideki başka bir dokümanın görselinin üzerine yazmasın
+        taken = taken_attachment_names(cat_dir, attachments)
+        if taken:
+            return "Dosya adı kullanımda: " + ", ".join(taken), 409
+
         save_path = os.path.join(cat_dir, slug + ".md")
         file.save(save_path)
+        record_revision(save_path)
+        save_attachments(cat_dir, attachments)
         return redirect(url_for("projects_page"))
 
     categories = get_categories(PROJECTS_DIR)
@@ -486,13 +1165,26 @@ def download_project(category, project_id):
     )
 
 
+@app.route("/projects/history/<category>/<project_id>")
+def project_history(category, project_id):
+    return history_response(PROJECTS_DIR, category, project_id)
+
+
+@app.route("/projects/revision/<category>/<project_id>/<int:rev>")
+def project_revision(category, project_id, rev):
+    return revision_response(PROJECTS_DIR, category, project_id, rev)
+
+
 @app.route("/projects/update/<category>/<project_id>", methods=["GET", "POST"])
 def update_project(category, project_id):
     project_path = os.path.join(PROJECTS_DIR, category, f"{project_id}.md")
 
     if request.method == "GET":
         if not os.path.exists(project_path):
-            abort(404)
+            # Silinmiş doküman: sadece geri yükleme formu gösterilir
+            if not is_deleted(project_path):
+                abort(404)
+            return render_template("update_project.html", project_id=project_id, category=category, content="", deleted=True)
         with open(project_path, "r", encoding="utf-8") as f:
             content = f.read()
         return render_template("update_project.html", project_id=project_id, category=category, content=content)
@@ -512,8 +1204,10 @@ def update_project(category, project_id):
         content = request.form.get("content")
         if content is None:
             abort(400)
+        record_current(project_path)
         with open(project_path, "w", encoding="utf-8") as f:
             f.write(content)
+        record_revision(project_path)
         return redirect(url_for("show_project", category=category, project_id=project_id))
 
     # Upload
@@ -523,7 +1217,34 @@ def update_project(category, project_id):
             abort(400)
         if not file.filename.endswith(".md"):
             abort(400)
+        record_current(project_path)
         file.save(project_path)
+        record_revision(project_path)
+        return redirect(url_for("show_project", category=category, project_id=project_id))
+
+    # Attach
+    if action == "attach":
+        if not os.path.exists(project_path):
+            abort(404)
+        attachments = [f for f in request.files.getlist("attachments") if f.filename]
+        if not attachments:
+            abort(400)
+        error = check_attachments(attachments)
+        if error:
+            return error, 400
+        cat_dir = os.path.join(PROJECTS_DIR, category)
+        taken = taken_attachment_names(cat_dir, attachments)
+        if taken:
+            return "Dosya adı kullanımda: " + ", ".join(taken), 409
+        save_attachments(cat_dir, attachments)
+        return redirect(url_for("update_project", category=category, project_id=project_id))
+
+    # Restore
+    if action == "restore":
+        # Boş bırakılırsa son içerikli revizyona döner (silinmiş dokümanlar için)
+        rev = get_requested_revision()
+        if not restore_revision(project_path, rev):
+            abort(404)
         return redirect(url_for("show_project", category=category, project_id=project_id))
 
     # Delete
@@ -535,6 +1256,7 @@ def update_project(category, project_id):
             return "Slug eşleşmiyor", 403
         if not os.path.exists(project_path):
             abort(404)
+        record_deletion(project_path)
         os.remove(project_path)
         return redirect(url_for("projects_page"))
 
@@ -556,15 +1278,10 @@ def show_note(category, note_id):
     if not os.path.exists(note_file):
         return "Not bulunamadı", 404
 
-    with open(note_file, "r", encoding="utf-8") as f:
-        md_content = f.read()
-
-    stat = os.stat(note_file)
-    ts = stat.st_ctime if platform.system() == "Windows" else stat.st_mtime
-    created_time = datetime.fromtimestamp(ts).strftime("%Y %m %d")
+    created_time = get_created_time(note_file)
 
     keywords = get_category_keywords(NOTES_DIR, category)
-    html_content = markdown2.markdown(md_content, extras=["fenced-code-blocks", "tables"])
+    html_content = render_markdown_file(note_file)
 
     return render_template('note.html',
         content=html_content,
@@ -601,6 +1318,11 @@ def add_note():
         if not allowed_file(file.filename):
             return "Sadece .md dosyası kabul edilir", 400
 
+        attachments = [f for f in request.files.getlist("attachments") if f.filename]
+        error = check_attachments(attachments)
+        if error:
+            return error, 400
+
         # Kategori belirleme
         if category_select == "__new__" and new_category:
             category = slugify(new_category)
@@ -620,8 +1342,15 @@ def add_note():
             slug = f"{base_slug}-{i}"
             i += 1
 
+        # Ekler, kategorideki başka bir dokümanın görselinin üzerine yazmasın
+        taken = taken_attachment_names(cat_dir, attachments)
+        if taken:
+            return "Dosya adı kullanımda: " + ", ".join(taken), 409
+
         save_path = os.path.join(cat_dir, slug + ".md")
         file.save(save_path)
+        record_revision(save_path)
+        save_attachments(cat_dir, attachments)
         return redirect(url_for("notes_page"))
 
     categories = get_categories(NOTES_DIR)
@@ -638,13 +1367,26 @@ def download_note(category, note_id):
     )
 
 
+@app.route("/notes/history/<category>/<note_id>")
+def note_history(category, note_id):
+    return history_response(NOTES_DIR, category, note_id)
+
+
+@app.route("/notes/revision/<category>/<note_id>/<int:rev>")
+def note_revision(category, note_id, rev):
+    return revision_response(NOTES_DIR, category, note_id, rev)
+
+
 @app.route("/notes/update/<category>/<note_id>", methods=["GET", "POST"])
 def update_note(category, note_id):
     note_path = os.path.join(NOTES_DIR, category, f"{note_id}.md")
 
     if request.method == "GET":
         if not os.path.exists(note_path):
-            abort(404)
+            # Silinmiş doküman: sadece geri yükleme formu gösterilir
+            if not is_deleted(note_path):
+                abort(404)
+            return render_template("update_note.html", note_id=note_id, category=category, content="", deleted=True)
         with open(note_path, "r", encoding="utf-8") as f:
             content = f.read()
         return render_template("update_note.html", note_id=note_id, category=category, content=content)
@@ -664,8 +1406,10 @@ def update_note(category, note_id):
         content = request.form.get("content")
         if content is None:
             abort(400)
+        record_current(note_path)
         with open(note_path, "w", encoding="utf-8") as f:
             f.write(content)
+        record_revision(note_path)
         return redirect(url_for("show_note", category=category, note_id=note_id))
 
     # Upload
@@ -675,7 +1419,34 @@ def update_note(category, note_id):
             abort(400)
         if not file.filename.endswith(".md"):
             abort(400)
+        record_current(note_path)
         file.save(note_path)
+        record_revision(note_path)
+        return redirect(url_for("show_note", category=category, note_id=note_id))
+
+    # Attach
+    if action == "attach":
+        if not os.path.exists(note_path):
+            abort(404)
+        attachments = [f for f in request.files.getlist("attachments") if f.filename]
+        if not attachments:
+            abort(400)
+        error = check_attachments(attachments)
+        if error:
+            return error, 400
+        cat_dir = os.path.join(NOTES_DIR, category)
+        taken = taken_attachment_names(cat_dir, attachments)
+        if taken:
+            return "Dosya adı kullanımda: " + ", ".join(taken), 409
+        save_attachments(cat_dir, attachments)
+        return redirect(url_for("update_note", category=category, note_id=note_id))
+
+    # Restore
+    if action == "restore":
+        # Boş bırakılırsa son içerikli revizyona döner (silinmiş dokümanlar için)
+        rev = get_requested_revision()
+        if not restore_revision(note_path, rev):
+            abort(404)
         return redirect(url_for("show_note", category=category, note_id=note_id))
 
     # Delete
@@ -687,11 +1458,118 @@ def update_note(category, note_id):
             return "Slug eşleşmiyor", 403
         if not os.path.exists(note_path):
             abort(404)
+        record_deletion(note_path)
         os.remove(note_path)
         return redirect(url_for("notes_page"))
 
     abort(400)
 
 
+# ── Fragmanlar ──────────────────────────────────────
+# Liste sayfalarındaki istemci taraflı gezinme için sadece doküman gövdesini
+# ve metadata'sını döndürür; tam sayfa (base.html) yeniden render edilmez.
+
+CONTENT_DIRS = {
+    "posts": (POSTS_DIR, "show_post", "post_id"),
+    "projects": (PROJECTS_DIR, "show_project", "project_id"),
+    "notes": (NOTES_DIR, "show_note", "note_id"),
+}
+
+
+@app.route("/fragment/<kind>/<category>/<slug>")
+def document_fragment(kind, category, slug):
+    if kind not in CONTENT_DIRS:
+        abort(404)
+    base_dir, endpoint, id_arg = CONTENT_DIRS[kind]
+    file_path = get_document_path(base_dir, category, slug)
+    if not file_path or not os.path.exists(file_path):
+        abort(404)
+
+    response = jsonify({
+        "html": render_markdown_file(file_path),
+        "meta": {
+            "slug": slug,
+            "title": slug.replace("-", " ").title(),
+            "category": category,
+            "keywords": get_category_keywords(base_dir, category),
+            # Liste sayfalarındaki kartla aynı tarih formatı
+            "date": datetime.fromtimestamp(os.path.getmtime(file_path)).strftime("%d %B %Y %H:%M"),
+            "url": url_for(endpoint, category=category, **{id_arg: slug}),
+        },
+    })
+    # Tarayıcı her seferinde doğrulasın; içerik değişmediyse 304 döner
+    response.headers["Cache-Control"] = "no-cache"
+    response.add_etag()
+    return response.make_conditional(request)
+
+
+# ── Medya ──────────────────────────────────────
+
+@app.route("/media/<kind>/<category>/<filename>")
+def media_file(kind, category, filename):
+    if kind not in CONTENT_DIRS or category != secure_filename(category):
+        abort(404)
+    if filename != secure_filename(filename) or not allowed_image(filename):
+        abort(404)
+    cat_dir = os.path.join(CONTENT_DIRS[kind][0], category)
+    source_path = os.path.join(cat_dir, filename)
+    if not os.path.isfile(source_path):
+        abort(404)
+
+    version = get_file_version(source_path)
+    width = request.args.get("w", type=int)
+    fmt = request.args.get("fmt")
+    ext = filename.rsplit(".", 1)[1].lower()
+
+    directory, path = cat_dir, filename
+    ready = True
+    if ext in RESIZABLE_EXTENSIONS and (width or fmt):
+        # Sadece srcset'teki genişlikler üretilir; aksi halde önbellek şişirilebilir
+        if width is not None:
+            try:
+                image_width = get_image_size(source_path)[0]
+            except Exception:
+                abort(404)
+            if width not in get_variant_widths(image_width):
+                abort(404)
+        if fmt not in (None, "webp"):
+            abort(404)
+        out_ext = fmt or ext
+        # Tam dosya adı kullanılır; a.png ve a.jpg aynı varyanta düşmesin
+        target_path = os.path.join(
+            MEDIA_CACHE_DIR, kind, category, f"{filename}-{version}-{width or 0}.{out_ext}"
+        )
+        variant = get_image_variant(source_path, target_path, width, PIL_FORMATS[out_ext])
+        if variant:
+            directory, path = os.path.split(variant)
+        else:
+            ready = False
+
+    response = send_from_directory(directory, path)
+    # Sürümlü URL'nin içeriği hiç değişmez; varyant henüz hazır değilse geçici
+    # olarak orijinal sunulur ve bu cevap önbelleğe alınmaz
+    if ready and request.args.get("v") == version:
+        response.headers["Cache-Control"] = "public, max-age=31536000, immutable"
+    else:
+        response.headers["Cache-Control"] = "no-cache"
+    return response
+
+
+@app.cli.command("prune-media")
+def prune_media_command():
+    """Silinmiş veya değişmiş görsellere ait önbellek varyantlarını temizler."""
+    removed = 0
+    for kind, (base_dir, _, _) in CONTENT_DIRS.items():
+        kind_dir = os.path.join(MEDIA_CACHE_DIR, kind)
+        if not os.path.isdir(kind_dir):
+            continue
+        for category in os.listdir(kind_dir):
+            variant_dir = os.path.join(kind_dir, category)
+            removed += prune_variant_dir(variant_dir, os.path.join(base_dir, category))
+            if not os.listdir(variant_dir):
+                os.rmdir(variant_dir)
+    click.echo(f"{removed} varyant silindi")
+
+
 if __name__ == "__main__":
     app.run(debug=True)
\ No newline at end of file
@@ -0,0 +1,113 @@
+// Liste sayfalarında (posts/projects/notes) öğeye tıklandığında tam sayfa
+// yüklemek yerine /fragment endpoint'inden sadece doküman gövdesini alır ve
+// sağdaki önizleme kartına yerleştirir. Üzerine gelindiğinde önceden yükler.
+(function () {
+  const pane = document.getElementById("previewPane");
+  if (!pane || !window.fetch) {
+    return;
+  }
+
+  const titleEl = pane.querySelector("[data-fragment='title']");
+  const dateEl = pane.querySelector("[data-fragment='date']");
+  const labelEl = pane.querySelector("[data-fragment='label']");
+  const bodyEl = pane.querySelector("[data-fragment='body']");
+  const initial = {
+    title: titleEl.innerHTML,
+    date: dateEl.innerHTML,
+    label: labelEl.innerHTML,
+    body: bodyEl.innerHTML,
+  };
+  const cache = new Map();
+
+  // Sadece devam eden istek ve kısa süreli prefetch sonucu tutulur; sonrası
+  // için tazelik kontrolü tarayıcının ETag/304 doğrulamasına bırakılır.
+  const PREFETCH_TTL_MS = 10000;
+
+  function loadFragment(url) {
+    let request = cache.get(url);
+    if (!request) {
+      request = fetch(url, { headers: { Accept: "application/json" } }).then((response) => {
+        if (!response.ok) {
+          throw new Error(response.status);
+        }
+        return response.json();
+      });
+      cache.set(url, request);
+      const forget = () => {
+        if (cache.get(url) === request) {
+          cache.delete(url);
+        }
+      };
+      request.then(() => setTimeout(forget, PREFETCH_TTL_MS), forget);
+    }
+    return request;
+  }
+
+  function setActive(link) {
+    document.querySelectorAll("a[data-fragment-url].active").forEach((a) => a.classList.remove("active"));
+    if (link) {
+      link.classList.add("active");
+    }
+  }
+
+  function showFragment(data) {
+    const meta = data.meta;
+    const a = document.createElement("a");
+    a.href = meta.url;
+    a.textContent = meta.title;
+    titleEl.replaceChildren(a);
+    dateEl.textContent = meta.date;
+    labelEl.textContent = meta.category.toLowerCase();
+    bodyEl.innerHTML = data.html;
+    bodyEl.classList.add("is-fragment");
+    pane.scrollIntoView({ block: "nearest" });
+  }
+
+  function showInitial() {
+    titleEl.innerHTML = initial.title;
+    dateEl.innerHTML = initial.date;
+    labelEl.innerHTML = initial.label;
+    bodyEl.innerHTML = initial.body;
+    bodyEl.classList.remove("is-fragment");
+    setActive(null);
+  }
+
+  document.querySelectorAll("a[data-fragment-url]").forEach((link) => {
+    const url = link.dataset.fragmentUrl;
+
+    link.addEventListener("mouseenter", () => {
+      loadFragment(url).catch(() => {});
+    });
+
+    link.addEventListener("click", (event) => {
+      if (event.button !== 0 || event.metaKey || event.ctrlKey || event.shiftKey || event.altKey) {
+        return;
+      }
+      event.preventDefault();
+      loadFragment(url)
+        .then((data) => {
+          showFragment(data);
+          setActive(link);
+          history.pushState({ fragmentUrl: url }, "", link.href);
+        })
+        .catch(() => {
+          // Fragman alınamazsa normal sayfa yüklemesine dön
+          window.location.href = link.href;
+        });
+    });
+  });
+
+  window.addEventListener("popstate", (event) => {
+    const url = event.state && event.state.fragmentUrl;
+    if (!url) {
+      showInitial();
+      return;
+    }
+    loadFragment(url)
+      .then((data) => {
+        showFragment(data);
+        setActive(document.querySelector(`a[data-fragment-url="${url}"]`));
+      })
+      .catch(() => window.location.reload());
+  });
+})();
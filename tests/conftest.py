@@ -0,0 +1,49 @@
+import os
+
+import bcrypt
+import pytest
+
+# app modülü import edilirken HASHED_PSW okunur
+TEST_KEY = "test-key"
+os.environ["HASHED_PSW"] = bcrypt.hashpw(TEST_KEY.encode(), bcrypt.gensalt()).decode()
+
+import app as blog  # noqa: E402
+
+
+@pytest.fixture
+def app_module(tmp_path, monkeypatch):
+    """Uygulamayı geçici bir içerik klasörüne yönlendirir."""
+    dirs = {}
+    for kind in ("posts", "projects", "notes"):
+        dirs[kind] = tmp_path / kind
+        dirs[kind].mkdir()
+    monkeypatch.setattr(blog, "BASE_DIR", str(tmp_path))
+    monkeypatch.setattr(blog, "POSTS_DIR", str(dirs["posts"]))
+    monkeypatch.setattr(blog, "PROJECTS_DIR", str(dirs["projects"]))
+    monkeypatch.setattr(blog, "NOTES_DIR", str(dirs["notes"]))
+    monkeypatch.setattr(blog, "MEDIA_CACHE_DIR", str(tmp_path / ".cache" / "media"))
+    monkeypatch.setattr(blog, "_variant_failures", set())
+    for kind, (_, endpoint, id_arg) in list(blog.CONTENT_DIRS.items()):
+        monkeypatch.setitem(blog.CONTENT_DIRS, kind, (str(dirs[kind]), endpoint, id_arg))
+    blog._render_markdown_cached.cache_clear()
+    blog._render_with_images_cached.cache_clear()
+    blog.app.config["TESTING"] = True
+    return blog
+
+
+@pytest.fixture
+def client(app_module):
+    return app_module.app.test_client()
+
+
+@pytest.fixture
+def make_doc(app_module):
+    """Geçmişi olmayan (eski usul) bir doküman oluşturur."""
+    def _make(kind, category, slug, content):
+        cat_dir = os.path.join(app_module.CONTENT_DIRS[kind][0], category)
+        os.makedirs(cat_dir, exist_ok=True)
+        path = os.path.join(cat_dir, slug + ".md")
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(content)
+        return path
+    return _make
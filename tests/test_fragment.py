@@ -0,0 +1,49 @@
+def test_fragment_returns_body_and_meta(client, make_doc):
+    make_doc("posts", "tech", "hello-world", "# Title\n\nbody")
+    r = client.get("/fragment/posts/tech/hello-world")
+    assert r.status_code == 200
+    data = r.get_json()
+    assert "<h1>Title</h1>" in data["html"]
+    assert "<html" not in data["html"]
+    assert data["meta"]["title"] == "Hello World"
+    assert data["meta"]["category"] == "tech"
+    assert data["meta"]["url"] == "/posts/tech/hello-world"
+    # Kart, liste sayfasındaki tarih formatını korumalı
+    assert data["meta"]["date"] in client.get("/posts").get_data(as_text=True)
+
+
+def test_fragment_etag_revalidates(client, make_doc):
+    path = make_doc("notes", "c", "d", "first")
+    r = client.get("/fragment/notes/c/d")
+    etag = r.headers["ETag"]
+    assert r.headers["Cache-Control"] == "no-cache"
+
+    r = client.get("/fragment/notes/c/d", headers={"If-None-Match": etag})
+    assert r.status_code == 304
+    assert r.data == b""
+
+    with open(path, "w", encoding="utf-8") as f:
+        f.write("second, changed")
+    r = client.get("/fragment/notes/c/d", headers={"If-None-Match": etag})
+    assert r.status_code == 200
+    assert "second" in r.get_json()["html"]
+
+
+def test_fragment_unknown_kind_or_document_is_404(client, make_doc):
+    make_doc("posts", "c", "d", "x")
+    assert client.get("/fragment/secrets/c/d").status_code == 404
+    assert client.get("/fragment/posts/c/missing").status_code == 404
+
+
+def test_list_page_links_to_fragments(client, make_doc):
+    make_doc("projects", "c", "d", "x")
+    page = client.get("/projects").get_data(as_text=True)
+    assert 'data-fragment-url="/fragment/projects/c/d"' in page
+    assert "fragment_nav.js" in page
+
+
+def test_fragment_rejects_path_traversal(app_module, client):
+    with open(f"{app_module.BASE_DIR}/secret.md", "w", encoding="utf-8") as f:
+        f.write("secret")
+    assert client.get("/fragment/posts/%2E%2E/secret").status_code == 404
+    assert client.get("/fragment/posts/c/%2E%2E").status_code == 404
@@ -0,0 +1,122 @@
+import io
+import random
+
+from conftest import TEST_KEY
+
+
+def test_delta_roundtrip_and_snapshots(app_module, make_doc):
+    path = make_doc("posts", "c", "d", "")
+    lines = [f"line {i}\n" for i in range(200)]
+    versions = []
+    rng = random.Random(0)
+    for k in range(45):
+        lines[rng.randrange(len(lines))] = f"edit {k}\n"
+        if k % 5 == 0:
+            lines.insert(3, "inserted\n")
+        versions.append("".join(lines))
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(versions[-1])
+        app_module.record_revision(path)
+
+    records = app_module.read_history(app_module.get_history_path(path))
+    assert [r["rev"] for r in records] == list(range(1, 46))
+    assert [r["kind"] for r in records].count("snapshot") == 3
+    for i, version in enumerate(versions, start=1):
+        assert app_module.reconstruct_revision(records, i) == version
+
+
+def test_compact_history_keep(app_module, make_doc):
+    path = make_doc("posts", "c", "d", "v0\n")
+    for i in range(1, 6):
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(f"v0\nv{i}\n")
+        app_module.record_revision(path)
+    log_path = app_module.get_history_path(path)
+
+    result = app_module.app.test_cli_runner().invoke(args=["compact-history", "--keep", "2"])
+    assert result.exit_code == 0
+
+    records = app_module.read_history(log_path)
+    assert [r["rev"] for r in records] == [4, 5]
+    assert records[0]["kind"] == "snapshot"
+    assert app_module.reconstruct_revision(records, 4) == "v0\nv4\n"
+    assert app_module.reconstruct_revision(records, 5) == "v0\nv5\n"
+
+
+def test_first_save_keeps_original(client, make_doc):
+    make_doc("notes", "123", "123", "original")
+    r = client.post("/notes/update/123/123", data={"key": TEST_KEY, "action": "save", "content": "new"})
+    assert r.status_code == 302
+
+    history = client.get("/notes/history/123/123").get_json()
+    assert [h["rev"] for h in history] == [1, 2]
+    assert client.get("/notes/revision/123/123/1").get_data(as_text=True) == "original"
+    assert client.get("/notes/revision/123/123/2").get_data(as_text=True) == "new"
+
+
+def test_stored_bytes_is_decoded_size(app_module, client, make_doc):
+    path = make_doc("posts", "c", "d", "hello")
+    app_module.record_revision(path)
+    record = app_module.read_history(app_module.get_history_path(path))[0]
+    history = client.get("/posts/history/c/d").get_json()
+    assert history[0]["stored_bytes"] == len(app_module.base64.b64decode(record["data"]))
+
+
+def test_delete_hides_history_and_can_be_restored(client, make_doc):
+    path = make_doc("posts", "c", "d", "never recorded")
+    r = client.post("/posts/update/c/d", data={"key": TEST_KEY, "action": "delete", "confirm_slug": "d"})
+    assert r.status_code == 302
+
+    assert client.get("/posts/history/c/d").status_code == 404
+    assert client.get("/posts/revision/c/d/1").status_code == 404
+
+    page = client.get("/posts/update/c/d")
+    assert page.status_code == 200
+    assert b'value="restore"' in page.data
+    assert b'value="delete"' not in page.data
+
+    r = client.post("/posts/update/c/d", data={"key": TEST_KEY, "action": "restore", "revision": ""})
+    assert r.status_code == 302
+    with open(path, encoding="utf-8") as f:
+        assert f.read() == "never recorded"
+    assert client.get("/posts/history/c/d").status_code == 200
+
+
+def test_update_get_unknown_document_is_404(client):
+    assert client.get("/posts/update/nope/d").status_code == 404
+
+
+def test_readded_slug_does_not_expose_deleted_revisions(client, make_doc):
+    make_doc("posts", "c", "x", "old private text")
+    client.post("/posts/update/c/x", data={"key": TEST_KEY, "action": "delete", "confirm_slug": "x"})
+
+    r = client.post(
+        "/posts/add",
+        data={"psw": TEST_KEY, "title": "x", "category_select": "c", "file": (io.BytesIO(b"new text"), "x.md")},
+        content_type="multipart/form-data",
+    )
+    assert r.status_code == 302
+
+    history = client.get("/posts/history/c/x").get_json()
+    assert len(history) == 1
+    assert client.get(f"/posts/revision/c/x/{history[0]['rev']}").get_data(as_text=True) == "new text"
+    for rev in range(1, history[0]["rev"]):
+        assert client.get(f"/posts/revision/c/x/{rev}").status_code == 404
+
+
+def test_compact_history_rejects_non_positive_keep(app_module, make_doc):
+    path = make_doc("posts", "c", "d", "v1")
+    app_module.record_revision(path)
+    runner = app_module.app.test_cli_runner()
+    for keep in ("0", "-1"):
+        assert runner.invoke(args=["compact-history", "--keep", keep]).exit_code != 0
+    assert len(app_module.read_history(app_module.get_history_path(path))) == 1
+
+
+def test_restore_rejects_non_numeric_revision(client, make_doc):
+    path = make_doc("posts", "c", "d", "v1")
+    client.post("/posts/update/c/d", data={"key": TEST_KEY, "action": "save", "content": "v2"})
+    r = client.post("/posts/update/c/d", data={"key": TEST_KEY, "action": "restore", "revision": "abc"})
+    assert r.status_code == 400
+    with open(path, encoding="utf-8") as f:
+        assert f.read() == "v2"
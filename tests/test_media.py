@@ -0,0 +1,220 @@
+import io
+import os
+
+from PIL import Image
+
+from conftest import TEST_KEY
+
+
+def image_file(size=(300, 200), fmt="PNG", exif=None):
+    buf = io.BytesIO()
+    kwargs = {"exif": exif} if exif is not None else {}
+    Image.new("RGB", size, "red").save(buf, fmt, **kwargs)
+    buf.seek(0)
+    return buf
+
+
+def attach(client, kind, category, slug, files):
+    return client.post(
+        f"/{kind}/update/{category}/{slug}",
+        data={"key": TEST_KEY, "action": "attach", "attachments": files},
+        content_type="multipart/form-data",
+    )
+
+
+def test_attach_saves_and_redirects(client, make_doc):
+    path = make_doc("posts", "c", "a", "![x](img.png)")
+    r = attach(client, "posts", "c", "a", [(image_file(), "img.png")])
+    assert r.status_code == 302
+    assert r.headers["Location"] == "/posts/update/c/a"
+    assert os.path.exists(os.path.join(os.path.dirname(path), "img.png"))
+
+
+def test_attach_refuses_taken_name(client, make_doc):
+    path = make_doc("posts", "c", "a", "![x](img.png)")
+    make_doc("posts", "c", "b", "![x](img.png)")
+    assert attach(client, "posts", "c", "a", [(image_file((2000, 1000)), "img.png")]).status_code == 302
+
+    r = attach(client, "posts", "c", "b", [(image_file((300, 300)), "img.png")])
+    assert r.status_code == 409
+    with Image.open(os.path.join(os.path.dirname(path), "img.png")) as img:
+        assert img.size == (2000, 1000)
+
+
+def test_attach_rejects_names_changed_by_sanitizing(client, make_doc):
+    path = make_doc("posts", "c", "a", "x")
+    for name in ("資料.png", "görsel 資料.png", "my pic.png"):
+        assert attach(client, "posts", "c", "a", [(image_file(), name)]).status_code == 400
+    assert sorted(os.listdir(os.path.dirname(path))) == ["a.md"]
+
+
+def test_attach_rejects_non_images(client, make_doc):
+    make_doc("posts", "c", "a", "x")
+    r = attach(client, "posts", "c", "a", [(io.BytesIO(b"<script>alert(1)</script>"), "evil.png")])
+    assert r.status_code == 400
+
+
+def test_attach_unknown_document_is_404(client):
+    assert attach(client, "posts", "nope", "d", [(image_file(), "img.png")]).status_code == 404
+
+
+def test_add_refuses_taken_attachment_name(client, make_doc):
+    make_doc("notes", "c", "a", "![x](img.png)")
+    assert attach(client, "notes", "c", "a", [(image_file(), "img.png")]).status_code == 302
+    r = client.post(
+        "/notes/add",
+        data={
+            "psw": TEST_KEY,
+            "title": "B",
+            "category_select": "c",
+            "file": (io.BytesIO(b"![x](img.png)"), "b.md"),
+            "attachments": [(image_file(), "img.png")],
+        },
+        content_type="multipart/form-data",
+    )
+    assert r.status_code == 409
+
+
+def test_variant_route_resizes_and_caches(client, make_doc):
+    make_doc("projects", "c", "a", "![x](big.png)")
+    attach(client, "projects", "c", "a", [(image_file((2000, 1000)), "big.png")])
+    html = client.get("/projects/c/a").get_data(as_text=True)
+    assert "<picture>" in html
+    assert 'width="2000" height="1000"' in html
+
+    src = html.split('<img src="', 1)[1].split('"', 1)[0].replace("&amp;", "&")
+    r = client.get(src)
+    assert r.status_code == 200
+    assert r.headers["Cache-Control"] == "public, max-age=31536000, immutable"
+    with Image.open(io.BytesIO(r.data)) as img:
+        assert img.size == (960, 480)
+
+    r = client.get(src + "&fmt=webp")
+    assert r.mimetype == "image/webp"
+    assert client.get(src.replace("w=960", "w=123")).status_code == 404
+    assert client.get(src.replace("v=", "v=old")).headers["Cache-Control"] == "no-cache"
+
+
+def test_replaced_image_changes_rendered_version(app_module, client, make_doc):
+    path = make_doc("posts", "c", "a", "![x](img.png)")
+    assert "<picture>" not in client.get("/posts/c/a").get_data(as_text=True)
+
+    attach(client, "posts", "c", "a", [(image_file((2000, 1000)), "img.png")])
+    before = client.get("/posts/c/a").get_data(as_text=True)
+    assert 'width="2000"' in before
+
+    # Aynı adla dışarıdan değiştirilen görsel: klasör mtime'ı değişmez
+    image_path = os.path.join(os.path.dirname(path), "img.png")
+    with open(image_path, "wb") as f:
+        f.write(image_file((300, 300)).getvalue())
+    os.utime(image_path, ns=(1, 1))
+
+    after = client.get("/posts/c/a").get_data(as_text=True)
+    assert 'width="300" height="300"' in after
+    assert "2000w" not in after
+    assert app_module.get_file_version(image_path) in after
+
+
+def test_exif_rotated_image_uses_displayed_size(client, make_doc):
+    make_doc("notes", "c", "a", "![x](phone.jpg)")
+    exif = Image.Exif()
+    exif[0x0112] = 6  # 90 derece döndürülmüş (telefon fotoğrafı)
+    attach(client, "notes", "c", "a", [(image_file((2000, 1000), "JPEG", exif), "phone.jpg")])
+
+    html = client.get("/notes/c/a").get_data(as_text=True)
+    assert 'width="1000" height="2000"' in html
+    assert "1000w" in html and "1600w" not in html
+
+    src = html.split('<img src="', 1)[1].split('"', 1)[0].replace("&amp;", "&")
+    assert "w=960" in src
+    with Image.open(io.BytesIO(client.get(src).data)) as img:
+        assert img.size == (960, 1920)
+    assert client.get(src.replace("w=960", "w=1000")).status_code == 200
+    assert client.get(src.replace("w=960", "w=2000")).status_code == 404
+
+
+def test_variant_failure_falls_back_to_original(app_module, client, make_doc, monkeypatch):
+    make_doc("posts", "c", "a", "![x](img.png)")
+    attach(client, "posts", "c", "a", [(image_file((2000, 1000)), "img.png")])
+    html = client.get("/posts/c/a").get_data(as_text=True)
+    src = html.split('<img src="', 1)[1].split('"', 1)[0].replace("&amp;", "&")
+
+    calls = []
+
+    def broken(*args):
+        calls.append(args)
+        raise OSError("no webp support")
+
+    monkeypatch.setattr(app_module, "_generate_variant", broken)
+    for _ in range(2):
+        r = client.get(src + "&fmt=webp")
+        assert r.status_code == 200
+        assert r.headers["Cache-Control"] == "no-cache"
+        with Image.open(io.BytesIO(r.data)) as img:
+            assert img.size == (2000, 1000)
+    assert len(calls) == 1
+
+
+def test_unreadable_image_width_check_is_404(app_module, client, make_doc):
+    path = make_doc("posts", "c", "a", "x")
+    attach(client, "posts", "c", "a", [(image_file(), "img.png")])
+    with open(os.path.join(os.path.dirname(path), "img.png"), "wb") as f:
+        f.write(b"truncated")
+    assert client.get("/media/posts/c/img.png?w=480").status_code == 404
+
+
+def variant_src(client, url):
+    html = client.get(url).get_data(as_text=True)
+    return html.split('<img src="', 1)[1].split('"', 1)[0].replace("&amp;", "&")
+
+
+def test_replaced_image_removes_old_variants(app_module, client, make_doc):
+    path = make_doc("posts", "c", "a", "![x](img.png)")
+    attach(client, "posts", "c", "a", [(image_file((2000, 1000)), "img.png")])
+    assert client.get(variant_src(client, "/posts/c/a")).status_code == 200
+    variant_dir = os.path.join(app_module.MEDIA_CACHE_DIR, "posts", "c")
+    old = os.listdir(variant_dir)
+    assert len(old) == 1 and old[0].startswith("img.png-")
+
+    image_path = os.path.join(os.path.dirname(path), "img.png")
+    with open(image_path, "wb") as f:
+        f.write(image_file((1500, 1000)).getvalue())
+    os.utime(image_path, ns=(1, 1))
+    assert client.get(variant_src(client, "/posts/c/a")).status_code == 200
+
+    new = os.listdir(variant_dir)
+    assert len(new) == 1 and new != old
+
+
+def test_variant_key_uses_full_filename(app_module, client, make_doc):
+    path = make_doc("posts", "c", "a", "![x](a.png)\n\n![y](a.jpg)")
+    attach(client, "posts", "c", "a", [(image_file((1000, 500)), "a.png"), (image_file((1000, 800), "JPEG"), "a.jpg")])
+    cat_dir = os.path.dirname(path)
+    for name in ("a.png", "a.jpg"):
+        os.utime(os.path.join(cat_dir, name), ns=(1, 1))
+
+    html = client.get("/posts/c/a").get_data(as_text=True)
+    srcs = [part.split('"', 1)[0].replace("&amp;", "&") for part in html.split('<img src="')[1:]]
+    sizes = []
+    for src in srcs:
+        with Image.open(io.BytesIO(client.get(src + "&fmt=webp").data)) as img:
+            sizes.append(img.size)
+    assert sizes == [(960, 480), (960, 768)]
+
+
+def test_prune_media_removes_variants_of_deleted_images(app_module, client, make_doc):
+    path = make_doc("notes", "c", "a", "![x](img.png)")
+    attach(client, "notes", "c", "a", [(image_file((1000, 500)), "img.png")])
+    client.get(variant_src(client, "/notes/c/a"))
+    variant_dir = os.path.join(app_module.MEDIA_CACHE_DIR, "notes", "c")
+    assert os.listdir(variant_dir)
+
+    runner = app_module.app.test_cli_runner()
+    assert "0 varyant" in runner.invoke(args=["prune-media"]).output
+    os.remove(os.path.join(os.path.dirname(path), "img.png"))
+    assert "1 varyant" in runner.invoke(args=["prune-media"]).output
+    assert not os.path.exists(variant_dir)
+
+
+def test_media_rejects_category_traversal(client):
+    assert client.get("/media/posts/%2E%2E/img.png").status_code == 404